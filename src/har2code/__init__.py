@@ -1,7 +1,10 @@
 """har2code package."""
 
+from .context import ConvertContext, iter_codes
 from .main import main as main_func
 
+__all__ = ["ConvertContext", "iter_codes", "main"]
+
 
 def main() -> None:
     """Run the main function."""
@@ -0,0 +1,194 @@
+"""Define the conversion context."""
+
+import heapq
+import io
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union, cast
+
+from .mime import (
+    FALLBACK_MIME_MAP,
+    guess_extension,
+    init_mimetypes,
+    read_custom_fallback_mime_map,
+)
+from .models import code, har
+from .parser import parse_entry
+from .reader import iter_har_entries
+
+HarSource = Union[str, os.PathLike, IO]
+
+DEFAULT_WINDOW = 1024
+
+
+def _reorder(
+    codes: Iterable[code.PythonCode], window: Optional[int], source: HarSource
+) -> Iterator[code.PythonCode]:
+    """
+    Yield Python code by timestamp, reordered within a window of entries.
+
+    A window of None sorts the whole source in memory. A ValueError is raised when
+    an entry is further out of order than the window.
+    """
+    if window is None:
+        yield from ConvertContext.sort_codes(codes)
+        return
+
+    heap: List[Tuple[float, int, code.PythonCode]] = []
+    last = None
+    for i, c in enumerate(codes):
+        heapq.heappush(heap, (c.timestamp, i, c))
+        if len(heap) <= window:
+            continue
+        timestamp, _, first = heapq.heappop(heap)
+        if last is not None and timestamp < last:
+            name = getattr(source, "name", source)
+            raise ValueError(
+                f"HAR entries of {name} are out of order by more than {window} "
+                f"entries: {timestamp} comes after {last}"
+            )
+        last = timestamp
+        yield first
+    while heap:
+        yield heapq.heappop(heap)[2]
+
+
+@contextmanager
+def open_har(source: HarSource, encoding: str = "utf-8") -> Iterator[IO[str]]:
+    """Open a HAR path, text stream or binary stream as a text stream."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "r", encoding=encoding) as fp:
+            yield fp
+    elif isinstance(source.read(0), bytes):
+        fp = io.TextIOWrapper(cast(IO[bytes], source), encoding=encoding)
+        try:
+            yield fp
+        finally:
+            fp.detach()
+    else:
+        yield cast(IO[str], source)
+
+
+@dataclass
+class ConvertContext:
+    """
+    Define the state of a HAR conversion.
+
+    A context owns the output directory, the MIME map, the exclusion list and
+    the caches, so several contexts can convert captures in parallel threads.
+    """
+
+    output: Path = Path("out")
+    exclude_exts: List[str] = field(default_factory=lambda: ["json"])
+    mime_map: Dict[str, str] = field(default_factory=lambda: dict(FALLBACK_MIME_MAP))
+    encoding: str = "utf-8"
+    # directory of the saved bodies as referenced by the generated code
+    location: Optional[Path] = None
+
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+    _output_ready: bool = field(default=False, init=False, repr=False, compare=False)
+    _ext_cache: Dict[Tuple[Optional[str], str], str] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        """Initialize the shared mimetypes database."""
+        self.output = Path(self.output)
+        if self.location is not None:
+            self.location = Path(self.location)
+        init_mimetypes()
+
+    @classmethod
+    def from_options(
+        cls, fallback_mime_map: Optional[str] = None, **kwargs: Any
+    ) -> "ConvertContext":
+        """Create a context, extending the MIME map from a custom JSON file."""
+        ctx = cls(**kwargs)
+        if fallback_mime_map:
+            ctx.mime_map.update(read_custom_fallback_mime_map(fallback_mime_map))
+        return ctx
+
+    def fork(self, **changes: Any) -> "ConvertContext":
+        """Create a context sharing the MIME map and the caches of this one."""
+        kwargs = {f.name: getattr(self, f.name) for f in fields(self) if f.init}
+        kwargs.update(changes)
+        ctx = type(self)(**kwargs)
+        if "mime_map" not in changes:
+            ctx._ext_cache = self._ext_cache
+        return ctx
+
+    def output_dir(self) -> Path:
+        """Return the output directory, creating it on first use."""
+        if not self._output_ready:
+            with self._lock:
+                if not self._output_ready:
+                    self.output.mkdir(parents=True, exist_ok=True)
+                    with open(self.output / ".gitignore", "w") as f:
+                        f.write("*")
+                    self._output_ready = True
+        return self.output
+
+    def locate(self, name: str) -> str:
+        """Return the location of a saved body as referenced by the generated code."""
+        return str((self.location or self.output) / name)
+
+    def save_body(self, name: str, raw: bytes) -> str:
+        """Save a body to the output directory, return its location."""
+        with open(self.output_dir() / name, "wb") as f:
+            f.write(raw)
+        return self.locate(name)
+
+    def guess_extension(self, mime: Optional[str], url_path: str) -> str:
+        """Guess extension from MIME type and URL path, with cache."""
+        key = (mime, os.path.splitext(url_path)[1].lower())
+        ext = self._ext_cache.get(key)
+        if ext is None:
+            ext = guess_extension(mime, url_path, self.mime_map)
+            self._ext_cache[key] = ext
+        return ext
+
+    def iter_entries(self, har_data: Dict[str, Any]) -> Iterator[code.PythonCode]:
+        """Yield Python code for each entry of loaded HAR data, in file order."""
+        for entry in har_data.get("log", {}).get("entries", []):
+            yield parse_entry(har.Entry.from_dict(entry), self)
+
+    def iter_codes(self, source: HarSource) -> Iterator[code.PythonCode]:
+        """Yield Python code for each entry of a HAR path or stream, in file order."""
+        with open_har(source, self.encoding) as fp:
+            for entry in iter_har_entries(fp):
+                yield parse_entry(har.Entry.from_dict(entry), self)
+
+    def merge_codes(
+        self, sources: Iterable[HarSource], window: Optional[int] = DEFAULT_WINDOW
+    ) -> Iterator[code.PythonCode]:
+        """
+        Yield Python code of several HAR paths or streams as one timeline.
+
+        HAR entries are not required to be in order, so each source is read
+        incrementally and reordered within `window` entries: memory depends on the
+        number of sources and on the window, not on their entries. A window of None
+        sorts each source in memory instead.
+        """
+        return heapq.merge(
+            *(_reorder(self.iter_codes(s), window, s) for s in sources),
+            key=lambda x: x.timestamp,
+        )
+
+    @staticmethod
+    def sort_codes(codes: Iterable[code.PythonCode]) -> List[code.PythonCode]:
+        """Sort Python code by timestamp."""
+        return sorted(codes, key=lambda x: x.timestamp)
+
+    def parse_codes(self, source: HarSource) -> List[code.PythonCode]:
+        """Parse a HAR path or stream to Python code, sorted by timestamp."""
+        return self.sort_codes(self.iter_codes(source))
+
+
+def iter_codes(source: HarSource, **kwargs: Any) -> Iterator[code.PythonCode]:
+    """Yield Python code for each entry of a HAR path or stream."""
+    return ConvertContext.from_options(**kwargs).iter_codes(source)
@@ -0,0 +1,110 @@
+"""Collapse duplicate and polling requests."""
+
+import json
+from dataclasses import asdict, replace
+from typing import Dict, Iterable, List, Tuple
+from urllib.parse import urlparse
+
+from .models import code
+
+COLLAPSE_MODES = ["none", "loop", "drop"]
+
+# Headers whose value changes between otherwise identical requests.
+VOLATILE_HEADERS = frozenset(
+    [
+        "content-length",
+        "date",
+        "if-modified-since",
+        "if-none-match",
+        "x-request-id",
+        "x-correlation-id",
+        "x-amzn-trace-id",
+        "x-b3-traceid",
+        "x-b3-spanid",
+        "x-b3-sampled",
+        "traceparent",
+        "tracestate",
+        "sentry-trace",
+        "baggage",
+    ]
+)
+
+
+def request_key(
+    request: code.Request, volatile_headers: Iterable[str] = VOLATILE_HEADERS
+) -> str:
+    """Build the normalized key of a request."""
+    volatile = {h.lower() for h in volatile_headers}
+    normalized = dict(
+        method=request.method.upper(),
+        url=request.url,
+        params=request.params,
+        headers={
+            k.lower(): v
+            for k, v in (request.headers or {}).items()
+            if k.lower() not in volatile
+        },
+        cookies=sorted((c.name, c.value) for c in request.cookies or []),
+        data=request.data,
+        json=request.json,
+        files={k: asdict(v) for k, v in (request.files or {}).items()},
+    )
+    return json.dumps(normalized, sort_keys=True, default=repr)
+
+
+def group_codes(
+    codes: Iterable[code.PythonCode], volatile_headers: Iterable[str] = VOLATILE_HEADERS
+) -> List[List[code.PythonCode]]:
+    """
+    Group runs of equivalent codes, ordered by their first occurrence.
+
+    A run ends at the first other request to the same host, so that requests made
+    after a state change (e.g. a login) are never replayed before it.
+    """
+    groups: List[List[code.PythonCode]] = []
+    runs: Dict[str, Tuple[str, List[code.PythonCode]]] = {}
+    for c in codes:
+        host = urlparse(c.request.url).netloc
+        key = request_key(c.request, volatile_headers)
+        run = runs.get(host)
+        if run is not None and run[0] == key:
+            run[1].append(c)
+            continue
+        group = [c]
+        groups.append(group)
+        runs[host] = (key, group)
+    return groups
+
+
+def _repeat_interval(group: List[code.PythonCode]) -> Tuple[int, float]:
+    """Compute the repeat count and the mean interval of a group."""
+    count = len(group)
+    if count < 2:
+        return count, 0.0
+    return count, (group[-1].timestamp - group[0].timestamp) / (count - 1)
+
+
+def collapse_codes(
+    codes: Iterable[code.PythonCode],
+    mode: str = "loop",
+    volatile_headers: Iterable[str] = VOLATILE_HEADERS,
+) -> List[code.PythonCode]:
+    """
+    Collapse equivalent requests into one code.
+
+    mode "loop" keeps the first occurrence with its repeat count and interval,
+    mode "drop" keeps the first occurrence only, mode "none" keeps everything.
+    """
+    if mode == "none":
+        return list(codes)
+    if mode not in COLLAPSE_MODES:
+        raise ValueError(f"Unknown collapse mode: {mode}")
+
+    collapsed = []
+    for group in group_codes(codes, volatile_headers):
+        if mode == "drop":
+            collapsed.append(group[0])
+            continue
+        repeat, interval = _repeat_interval(group)
+        collapsed.append(replace(group[0], repeat=repeat, interval=interval))
+    return collapsed
@@ -2,20 +2,61 @@
 
 import argparse
 import json
+import sys
+from contextlib import nullcontext
+from typing import Any, Iterable, List, Tuple
 
-from .mime import exts_type, load_custom_fallback_mime_map
-from .parser import parse_codes
-from .tostr import code_to_str
+from .context import DEFAULT_WINDOW, ConvertContext
+from .dedup import COLLAPSE_MODES, collapse_codes
+from .mime import exts_type
+from .models.code import PythonCode
+from .sidecar import DEFAULT_THRESHOLD, Sidecar
+from .store import DEFAULT_BATCH_SIZE, SqliteContext, SqliteStore
+from .tostr import iter_code_str
+
+
+def non_negative_int(value: str) -> int:
+    """Convert value to a non-negative int."""
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must not be negative: {value}")
+    return number
+
+
+def _reject_options(
+    parser: argparse.ArgumentParser, mode: str, options: List[Tuple[str, Any]]
+) -> None:
+    """Exit with an error when any of the options is set along with mode."""
+    ignored = [option for option, value in options if value]
+    if ignored:
+        parser.error(f"{mode} cannot be used with {', '.join(ignored)}")
 
 
 def main():
     """Convert HAR file to Python code."""
     parser = argparse.ArgumentParser(description="Convert HAR file to Python code.")
-    parser.add_argument("har_file", help="Path to the HAR file.")
+    parser.add_argument(
+        "har_file",
+        nargs="+",
+        help=(
+            "Path to the HAR file. Several files are merged into one "
+            "chronological script."
+        ),
+    )
+    parser.add_argument(
+        "--merge-window",
+        type=non_negative_int,
+        default=DEFAULT_WINDOW,
+        help=(
+            "Number of entries of each file reordered by startedDateTime when "
+            "several files are merged, 0 sorts each file in memory. "
+            f"Default is {DEFAULT_WINDOW}."
+        ),
+    )
     parser.add_argument(
         "--library",
         choices=["requests", "httpx"],
-        default="requests",
+        default=None,
         help="Python library to use for the generated code. Default is requests.",
     )
     parser.add_argument(
@@ -26,10 +67,11 @@ def main():
     parser.add_argument(
         "--no-files",
         type=exts_type,
-        default="json",
+        default=None,
         help=(
             "File extension of the response content to be not saved. etc. json,js; "
-            "Default is json.",
+            "Default is json, and none with --sqlite so every body is stored as a "
+            "deduplicated blob."
         ),
     )
     parser.add_argument(
@@ -43,13 +85,137 @@ def main():
             "or extend the default FALLBACK_MIME_MAP."
         ),
     )
+    parser.add_argument(
+        "--collapse",
+        choices=COLLAPSE_MODES,
+        default="none",
+        help=(
+            "Collapse equivalent requests (same method, URL, params and body, "
+            "volatile headers ignored). 'loop' emits one request repeated with "
+            "its count and interval, 'drop' keeps the first one only. "
+            "Default is none."
+        ),
+    )
+    parser.add_argument(
+        "--sidecar",
+        default=None,
+        help=(
+            "Path to a JSON lines data file for large request payloads. "
+            "The generated code loads each payload by offset when the request runs."
+        ),
+    )
+    parser.add_argument(
+        "--sidecar-threshold",
+        type=int,
+        default=DEFAULT_THRESHOLD,
+        help=(
+            "Minimum size in bytes of a payload moved to the sidecar data file. "
+            f"Default is {DEFAULT_THRESHOLD}."
+        ),
+    )
+    parser.add_argument(
+        "--sqlite",
+        default=None,
+        help=(
+            "Path to a SQLite database to write the entries and bodies into, "
+            "instead of printing the generated code. "
+            "Use har2code-query to generate code for matched entries."
+        ),
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=(
+            "Number of entries inserted per SQLite transaction. "
+            f"Default is {DEFAULT_BATCH_SIZE}."
+        ),
+    )
+    parser.add_argument(
+        "--report",
+        choices=["json", "csv"],
+        default=None,
+        help=(
+            "Print a timing report instead of the generated code: per-host and "
+            "per-endpoint percentiles, slowest entries and transfer sizes. "
+            "CSV contains the per-host and per-endpoint rows. Requires numpy."
+        ),
+    )
+    parser.add_argument(
+        "--report-top",
+        type=non_negative_int,
+        default=20,
+        help="Number of slowest entries in the timing report. Default is 20.",
+    )
     args = parser.parse_args()
-    load_custom_fallback_mime_map(args.fallback_mime_map)
+    # options of the generated script are rejected by the modes ignoring them
+    script_options = [
+        ("--library", args.library),
+        ("--collapse", args.collapse != "none"),
+        ("--sidecar", args.sidecar),
+    ]
+    if args.sqlite is not None:
+        _reject_options(
+            parser, "--sqlite", script_options + [("--report", args.report)]
+        )
+    if args.report is not None:
+        _reject_options(parser, "--report", script_options)
+
+    if args.report is not None:
+        # numpy is only imported when a report is asked for
+        from .report import build_report, load_columns, write_csv
+
+        report = build_report(
+            load_columns(args.har_file, args.encoding), args.report_top
+        )
+        if args.report == "json":
+            print(json.dumps(report, indent=2))
+        else:
+            write_csv(report, sys.stdout)
+        return
+
+    if args.sqlite is not None:
+        with SqliteStore(args.sqlite) as store:
+            sqlite_ctx = SqliteContext.from_options(
+                args.fallback_mime_map,
+                exclude_exts=args.no_files or [],
+                encoding=args.encoding,
+                store=store,
+            )
+            for har_file in args.har_file:
+                store.write(sqlite_ctx, har_file, args.batch_size)
+        return
+
+    ctx = ConvertContext.from_options(
+        args.fallback_mime_map,
+        exclude_exts=["json"] if args.no_files is None else args.no_files,
+        encoding=args.encoding,
+    )
+
+    codes: Iterable[PythonCode]
+    if len(args.har_file) == 1:
+        codes = ctx.parse_codes(args.har_file[0])
+    else:
+        codes = ctx.merge_codes(args.har_file, args.merge_window or None)
 
-    with open(args.har_file, "r", encoding="utf-8") as fp:
-        har_data = json.load(fp)
+    # a merged file out of order by more than the window fails while streaming
+    try:
+        timed = False
+        if args.collapse != "none":
+            codes = collapse_codes(codes, args.collapse)
+            timed = any(code.repeat > 1 for code in codes)
 
-    print(code_to_str(parse_codes(har_data, args.no_files), args.library))
+        sidecar_file = (
+            Sidecar(args.sidecar, args.sidecar_threshold)
+            if args.sidecar
+            else nullcontext()
+        )
+        with sidecar_file as sidecar:
+            library = args.library or "requests"
+            for chunk in iter_code_str(codes, library, sidecar, timed):
+                print(chunk)
+    except ValueError as e:
+        parser.error(str(e))
 
 
 if __name__ == "__main__":
@@ -3,7 +3,8 @@
 import json
 import mimetypes
 import os
-from typing import List, Optional, Tuple
+import threading
+from typing import Dict, List, Optional, Tuple
 
 from .utils import parse_header
 
@@ -37,13 +38,28 @@ FALLBACK_MIME_MAP = {
 }
 
 
-def load_custom_fallback_mime_map(filename: str) -> None:
-    """Load custom MIME types."""
+_mimetypes_lock = threading.Lock()
+
+
+def init_mimetypes() -> None:
+    """Initialize the mimetypes database once."""
+    with _mimetypes_lock:
+        if not mimetypes.inited:
+            mimetypes.init()
+
+
+def read_custom_fallback_mime_map(filename: str) -> Dict[str, str]:
+    """Read custom MIME types."""
     try:
         with open(filename, "rb") as fp:
-            FALLBACK_MIME_MAP.update(json.load(fp))
+            return dict(json.load(fp))
     except FileNotFoundError:
-        pass
+        return {}
+
+
+def load_custom_fallback_mime_map(filename: str) -> None:
+    """Load custom MIME types."""
+    FALLBACK_MIME_MAP.update(read_custom_fallback_mime_map(filename))
 
 
 def mime_parse(mime: str | None) -> Tuple[str | None, str]:
@@ -56,7 +72,9 @@ def mime_parse(mime: str | None) -> Tuple[str | None, str]:
     return mime_type, encoding
 
 
-def guess_extension_from_mime(mime: Optional[str]) -> Optional[str]:
+def guess_extension_from_mime(
+    mime: Optional[str], fallback_mime_map: Optional[Dict[str, str]] = None
+) -> Optional[str]:
     """Convert MIME type to extension."""
     if not mime:
         return None
@@ -65,8 +83,10 @@ def guess_extension_from_mime(mime: Optional[str]) -> Optional[str]:
     if ext:
         return ext
 
-    if mime in FALLBACK_MIME_MAP:
-        return FALLBACK_MIME_MAP[mime]
+    if fallback_mime_map is None:
+        fallback_mime_map = FALLBACK_MIME_MAP
+    if mime in fallback_mime_map:
+        return fallback_mime_map[mime]
 
     return None
 
@@ -80,10 +100,14 @@ def guess_extension_from_url_path(path: str) -> Optional[str]:
     return None
 
 
-def guess_extension(mime: Optional[str], path: str) -> str:
+def guess_extension(
+    mime: Optional[str],
+    path: str,
+    fallback_mime_map: Optional[Dict[str, str]] = None,
+) -> str:
     """Guess extension from MIME type and URL path."""
     uext = guess_extension_from_url_path(path)
-    mext = guess_extension_from_mime(mime)
+    mext = guess_extension_from_mime(mime, fallback_mime_map)
 
     if (
         uext != mext
@@ -69,3 +69,5 @@ class PythonCode:
     datetime: str
     request: Request
     response: Response
+    repeat: int = 1
+    interval: float = 0.0
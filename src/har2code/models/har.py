@@ -217,6 +217,11 @@ class Entry:
     cache: Cache
     timings: Dict[str, Any]
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Entry":
+        """Convert HAR entry data to Python object."""
+        return from_dict(data_class=cls, data=data)
+
 
 @dataclass
 class Har:
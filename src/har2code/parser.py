@@ -5,20 +5,17 @@ import json
 import secrets
 from dataclasses import asdict
 from datetime import datetime
-from pathlib import Path
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List
 from urllib.parse import parse_qs, urlparse
 
-from .mime import guess_extension, mime_parse
+from .mime import FALLBACK_MIME_MAP, mime_parse
 from .models import code, har
 
-OUTPUT = Path("out")
-OUTPUT.mkdir(exist_ok=True)
-with open(OUTPUT / ".gitignore", "w") as f:
-    f.write("*")
+if TYPE_CHECKING:
+    from .context import ConvertContext
 
 
-def parse_content(content: har.Content, exclude_exts: List[str], url_path: str) -> str:
+def parse_content(content: har.Content, url_path: str, ctx: "ConvertContext") -> str:
     """Parse content and add code to the list."""
     mime, encoding = mime_parse(content.mimeType)
     content_encoding = content.encoding
@@ -27,33 +24,34 @@ def parse_content(content: har.Content, exclude_exts: List[str], url_path: str)
     filename = None
 
     if content.size is not None and content.size > 0:
-        ext = guess_extension(mime, url_path)
+        ext = ctx.guess_extension(mime, url_path)
 
         if content_encoding is not None and content_encoding == "base64":
             raw_content = base64.b64decode(content_text or "")
 
-        if ext.lstrip(".") not in exclude_exts:
+        if ext.lstrip(".") not in ctx.exclude_exts:
             if raw_content is None:
                 raw_content = content_text.encode()
 
-            filename = OUTPUT / f"binary-{secrets.token_hex(4)}{ext}"
+            filename = f"binary-{secrets.token_hex(4)}{ext}"
         else:
             if raw_content is not None:
                 try:
                     content_text = raw_content.decode(encoding)
                 except UnicodeDecodeError:
                     # fallback: 保存为 bin
-                    filename = OUTPUT / f"unknown-{secrets.token_hex(4)}.bin"
+                    filename = f"unknown-{secrets.token_hex(4)}.bin"
 
         if filename is not None and raw_content is not None:
-            with open(filename, "wb") as f:
-                f.write(raw_content)
-            content_text = f"=== Save to file: {filename} ==="
+            location = ctx.save_body(filename, raw_content)
+            content_text = f"=== Save to file: {location} ==="
 
     return content_text or ""
 
 
-def parse_post_data(post_data: har.PostData | None) -> dict[str, Any]:
+def parse_post_data(
+    post_data: har.PostData | None, ctx: "ConvertContext"
+) -> dict[str, Any]:
     """Parse post data and add code to the list."""
     data: dict[str, Any] | str | None = None
     json_dict: dict[str, Any] | None = None
@@ -85,13 +83,11 @@ def parse_post_data(post_data: har.PostData | None) -> dict[str, Any]:
             value = param.value
             if file_name:
                 # 模拟文件上传，value 是文件内容
-                filename = (
-                    OUTPUT
-                    / f"binary-{secrets.token_hex(4)}-{file_name.replace('/', '_')}"
+                filename = ctx.save_body(
+                    f"binary-{secrets.token_hex(4)}-{file_name.replace('/', '_')}",
+                    base64.b64decode(value or ""),
                 )
-                with open(filename, "wb") as f:
-                    f.write(base64.b64decode(value or ""))
-                files[name] = code.Flie(file_name, str(filename))
+                files[name] = code.Flie(file_name, filename)
             else:
                 data[name] = value
     else:
@@ -122,18 +118,18 @@ def parse_cookie(cookie: har.Cookie) -> code.Cookie | None:
 
 
 def parse_response(
-    response: har.Response, exclude_exts: List[str], url_path: str
+    response: har.Response, url_path: str, ctx: "ConvertContext"
 ) -> code.Response:
     """Parse response and add code to the list."""
     return code.Response(
         status=response.status,
         httpVersion=response.httpVersion,
         headers=response.headers,
-        content=parse_content(response.content, exclude_exts, url_path),
+        content=parse_content(response.content, url_path, ctx),
     )
 
 
-def parse_request(request: har.Request) -> code.Request:
+def parse_request(request: har.Request, ctx: "ConvertContext") -> code.Request:
     """Parse request and add code to the list."""
     kwargs = dict(
         method=request.method,
@@ -145,27 +141,27 @@ def parse_request(request: har.Request) -> code.Request:
             if cookie
         ],
         params=parse_param(request.queryString),
-        **parse_post_data(request.postData),
+        **parse_post_data(request.postData, ctx),
     )
     return code.Request(**kwargs)
 
 
+def parse_entry(entry: har.Entry, ctx: "ConvertContext") -> code.PythonCode:
+    """Parse HAR entry to Python code."""
+    return code.PythonCode(
+        timestamp=datetime.fromisoformat(entry.startedDateTime).timestamp(),
+        time=f"{entry.time}, {entry.startedDateTime}",
+        datetime=entry.startedDateTime,
+        request=parse_request(entry.request, ctx),
+        response=parse_response(entry.response, urlparse(entry.request.url).path, ctx),
+    )
+
+
 def parse_codes(
     har_data: Dict[str, Any], exclude_exts: List[str]
 ) -> List[code.PythonCode]:
     """Parse HAR data to Python code."""
-    entries = har.Har.from_dict(har_data).entries
-    codes = []
-    for entry in entries:
-        codes.append(
-            code.PythonCode(
-                timestamp=datetime.fromisoformat(entry.startedDateTime).timestamp(),
-                time=f"{entry.time}, {entry.startedDateTime}",
-                datetime=entry.startedDateTime,
-                request=parse_request(entry.request),
-                response=parse_response(
-                    entry.response, exclude_exts, urlparse(entry.request.url).path
-                ),
-            )
-        )
-    return sorted(codes, key=lambda x: x.timestamp)
+    from .context import ConvertContext
+
+    ctx = ConvertContext(exclude_exts=exclude_exts, mime_map=FALLBACK_MIME_MAP)
+    return ctx.sort_codes(ctx.iter_entries(har_data))
@@ -0,0 +1,114 @@
+"""Read HAR entries incrementally."""
+
+import json
+import re
+from typing import IO, Any, Dict, Iterator
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_TAIL = re.compile(r"[0-9+\-.eE]*")
+_DECODER = json.JSONDecoder()
+
+
+class _Reader:
+    """Define a JSON reader over a text stream, decoding one value at a time."""
+
+    def __init__(self, fp: IO[str], chunk_size: int) -> None:
+        """Initialize the reader."""
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Read more data, at least doubling the pending buffer."""
+        if self.eof:
+            return False
+        chunk = self.fp.read(max(self.chunk_size, len(self.buf) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        pos, self.pos = self.pos, 0
+        self.buf = self.buf[pos:] + chunk
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace, return the next character or "" at the end."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()  # type: ignore
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        """Consume the next character, which must be one of chars."""
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(
+                f"Invalid HAR data: expected one of {chars!r}, got {char!r}"
+            )
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Decode the next JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # a number running up to the end of the buffer may be truncated,
+            # e.g. "0." decodes as 0 and "1e" as 1
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                tail = _NUMBER_TAIL.match(self.buf, end).end()  # type: ignore
+                if tail == len(self.buf) and self.fill():
+                    continue
+            self.pos = end
+            return value
+
+    def members(self) -> Iterator[str]:
+        """Yield the keys of an object, the caller consumes each value."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.expect(",}") == "}":
+                return
+
+
+def iter_har_entries(
+    fp: IO[str], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the raw entries of a HAR text stream, in file order.
+
+    Only one entry is decoded at a time, so memory depends on the largest entry
+    instead of the whole file.
+    """
+    reader = _Reader(fp, chunk_size)
+    for key in reader.members():
+        if key != "log":
+            reader.value()
+            continue
+        for log_key in reader.members():
+            if log_key != "entries":
+                reader.value()
+                continue
+            reader.expect("[")
+            if reader.peek() == "]":
+                reader.pos += 1
+                continue
+            while True:
+                yield reader.value()
+                if reader.expect(",]") == "]":
+                    break
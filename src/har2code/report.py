@@ -0,0 +1,251 @@
+"""Report timing analytics of HAR entries."""
+
+import csv
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import IO, Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from .context import HarSource, open_har
+from .reader import iter_har_entries
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+PHASES = ["blocked", "dns", "connect", "ssl", "send", "wait", "receive"]
+PERCENTILES = [50, 90, 99]
+SIZE_BINS = [0, 1 << 10, 10 << 10, 100 << 10, 1 << 20, 10 << 20]
+
+
+@dataclass
+class TimingColumns:
+    """Define the columnar timings, sizes, status and host of HAR entries."""
+
+    timestamp: "np.ndarray"
+    time: "np.ndarray"
+    phases: "np.ndarray"
+    status: "np.ndarray"
+    request_size: "np.ndarray"
+    response_size: "np.ndarray"
+    host: "np.ndarray"
+    endpoint: "np.ndarray"
+    hosts: List[str]
+    endpoints: List[str]
+
+    def __len__(self) -> int:
+        """Return the number of entries."""
+        return len(self.time)
+
+
+def _require_numpy() -> None:
+    """Raise an error when numpy is not installed."""
+    if np is None:
+        raise RuntimeError("The report requires numpy: pip install 'har2code[report]'")
+
+
+def _size(value: Any) -> float:
+    """Convert a HAR size to float, NaN when not available."""
+    if value is None or value < 0:
+        return float("nan")
+    return float(value)
+
+
+def _response_size(response: Dict[str, Any]) -> float:
+    """Compute the transfer size of a HAR response, NaN when not available."""
+    for size in [
+        response.get("_transferSize"),
+        response.get("bodySize"),
+        (response.get("content") or {}).get("size"),
+    ]:
+        if size is not None and size >= 0:
+            return float(size)
+    return float("nan")
+
+
+def _label(labels: Dict[str, int], label: str) -> int:
+    """Convert a label to its id."""
+    return labels.setdefault(label, len(labels))
+
+
+def load_columns(
+    sources: Iterable[HarSource], encoding: str = "utf-8"
+) -> TimingColumns:
+    """Load the timings of HAR paths or streams into columnar arrays."""
+    _require_numpy()
+
+    timestamp, time, phases = array("d"), array("d"), array("d")
+    request_size, response_size = array("d"), array("d")
+    status, host, endpoint = array("i"), array("i"), array("i")
+    hosts: Dict[str, int] = {}
+    endpoints: Dict[str, int] = {}
+
+    for source in sources:
+        with open_har(source, encoding) as fp:
+            for entry in iter_har_entries(fp):
+                request = entry.get("request", {})
+                response = entry.get("response", {})
+                timings = entry.get("timings") or {}
+                url = urlparse(request.get("url", ""))
+
+                timestamp.append(
+                    datetime.fromisoformat(entry["startedDateTime"]).timestamp()
+                )
+                time.append(_size(entry.get("time")))
+                phases.extend(_size(timings.get(phase)) for phase in PHASES)
+                status.append(int(response.get("status") or 0))
+                request_size.append(_size(request.get("bodySize")))
+                response_size.append(_response_size(response))
+                host.append(_label(hosts, url.netloc))
+                endpoint.append(
+                    _label(
+                        endpoints,
+                        f"{request.get('method', '')} {url.netloc}{url.path}",
+                    )
+                )
+
+    return TimingColumns(
+        timestamp=np.frombuffer(timestamp, dtype=np.float64),
+        time=np.frombuffer(time, dtype=np.float64),
+        phases=np.frombuffer(phases, dtype=np.float64).reshape(-1, len(PHASES)),
+        status=np.frombuffer(status, dtype=np.int32),
+        request_size=np.frombuffer(request_size, dtype=np.float64),
+        response_size=np.frombuffer(response_size, dtype=np.float64),
+        host=np.frombuffer(host, dtype=np.int32),
+        endpoint=np.frombuffer(endpoint, dtype=np.int32),
+        hosts=list(hosts),
+        endpoints=list(endpoints),
+    )
+
+
+def group_stats(
+    ids: "np.ndarray", n_groups: int, values: "np.ndarray"
+) -> Dict[str, "np.ndarray"]:
+    """Compute count, percentiles, mean and max of values per group, NaN ignored."""
+    mask = ~np.isnan(values)
+    ids, values = ids[mask], values[mask]
+    order = np.lexsort((values, ids))
+    ids, values = ids[order], values[order]
+
+    counts = np.bincount(ids, minlength=n_groups)
+    empty = counts == 0
+    stats = dict(count=counts)
+    if not len(values):
+        for stat in [f"p{q}" for q in PERCENTILES] + ["mean", "max"]:
+            stats[stat] = np.full(n_groups, np.nan)
+        return stats
+
+    # percentiles by linear interpolation between the sorted values of each group
+    starts = np.cumsum(counts) - counts
+    last = np.maximum(starts + counts - 1, 0)
+    for q in PERCENTILES:
+        pos = starts + (np.maximum(counts, 1) - 1) * (q / 100)
+        lo = np.minimum(np.floor(pos).astype(np.int64), last)
+        hi = np.minimum(lo + 1, last)
+        value = values[lo] + (values[hi] - values[lo]) * (pos - lo)
+        stats[f"p{q}"] = np.where(empty, np.nan, value)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        total = np.bincount(ids, weights=values, minlength=n_groups)
+        stats["mean"] = np.where(empty, np.nan, total / counts)
+    stats["max"] = np.where(empty, np.nan, values[last])
+    return stats
+
+
+def _float(value: Any) -> Optional[float]:
+    """Convert a number to a rounded float, None when NaN."""
+    value = float(value)
+    if np.isnan(value):
+        return None
+    return round(value, 3)
+
+
+def _group_rows(
+    scope: str, ids: "np.ndarray", labels: List[str], columns: TimingColumns
+) -> List[Dict[str, Any]]:
+    """Compute the timing rows of each group, slowest p90 first."""
+    n_groups = len(labels)
+    time = group_stats(ids, n_groups, columns.time)
+    wait = group_stats(ids, n_groups, columns.phases[:, PHASES.index("wait")])
+    phase_means = [
+        group_stats(ids, n_groups, columns.phases[:, i])["mean"]
+        for i in range(len(PHASES))
+    ]
+    entries = np.bincount(ids, minlength=n_groups)
+    request_bytes = np.bincount(
+        ids, weights=np.nan_to_num(columns.request_size), minlength=n_groups
+    )
+    response_bytes = np.bincount(
+        ids, weights=np.nan_to_num(columns.response_size), minlength=n_groups
+    )
+
+    rows = []
+    for i in np.argsort(-np.nan_to_num(time["p90"], nan=-1), kind="stable"):
+        row: Dict[str, Any] = dict(scope=scope, key=labels[i], count=int(entries[i]))
+        for name, stats in [("time", time), ("wait", wait)]:
+            for stat in [f"p{q}" for q in PERCENTILES] + ["mean", "max"]:
+                row[f"{name}_{stat}"] = _float(stats[stat][i])
+        for phase, means in zip(PHASES, phase_means):
+            row[f"{phase}_mean"] = _float(means[i])
+        row["request_bytes"] = int(request_bytes[i])
+        row["response_bytes"] = int(response_bytes[i])
+        rows.append(row)
+    return rows
+
+
+def build_report(columns: TimingColumns, top: int = 20) -> Dict[str, Any]:
+    """Build the timing report of columnar HAR entries."""
+    _require_numpy()
+
+    time = np.nan_to_num(columns.time, nan=-1)
+    top = min(top, len(columns))
+    slowest = np.argpartition(-time, top - 1)[:top] if top else np.array([], int)
+    slowest = slowest[np.argsort(-time[slowest], kind="stable")]
+
+    sizes = columns.response_size[~np.isnan(columns.response_size)]
+    histogram, _ = np.histogram(sizes, bins=SIZE_BINS + [np.inf])
+    statuses, status_counts = np.unique(columns.status, return_counts=True)
+
+    return dict(
+        entries=len(columns),
+        hosts=_group_rows("host", columns.host, columns.hosts, columns),
+        endpoints=_group_rows("endpoint", columns.endpoint, columns.endpoints, columns),
+        slowest=[
+            dict(
+                endpoint=columns.endpoints[columns.endpoint[i]],
+                datetime=datetime.fromtimestamp(
+                    columns.timestamp[i], timezone.utc
+                ).isoformat(),
+                time=_float(columns.time[i]),
+                status=int(columns.status[i]),
+                **{
+                    phase: _float(columns.phases[i, j])
+                    for j, phase in enumerate(PHASES)
+                },
+            )
+            for i in slowest
+        ],
+        status={str(s): int(c) for s, c in zip(statuses, status_counts)},
+        response_sizes=dict(
+            total=int(sizes.sum()),
+            **{
+                f"p{q}": _float(np.percentile(sizes, q)) if len(sizes) else None
+                for q in PERCENTILES
+            },
+            histogram=[
+                dict(min=lo, count=int(count))
+                for lo, count in zip(SIZE_BINS, histogram)
+            ],
+        ),
+    )
+
+
+def write_csv(report: Dict[str, Any], fp: IO[str]) -> None:
+    """Write the host and endpoint rows of a report as CSV."""
+    rows = report["hosts"] + report["endpoints"]
+    if not rows:
+        return
+    writer = csv.DictWriter(fp, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
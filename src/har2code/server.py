@@ -0,0 +1,295 @@
+"""Serve HAR to Python code conversions over localhost HTTP."""
+
+import argparse
+import io
+import json
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import IO, Any, Dict, Tuple, Union
+from urllib.parse import parse_qs, urlparse
+
+from dacite import DaciteError
+
+from .context import ConvertContext
+from .dedup import COLLAPSE_MODES, collapse_codes
+from .mime import exts_type
+from .tostr import code_to_str
+
+DEFAULT_MAX_BODY_SIZE = 512 << 20
+ROUTES = ["/convert", "/archive", "/metrics"]
+
+
+class BoundedReader(io.RawIOBase):
+    """Define a reader of at most `length` bytes of a stream."""
+
+    def __init__(self, fp: Union[IO[bytes], io.BufferedIOBase], length: int) -> None:
+        """Initialize the reader."""
+        self.fp = fp
+        self.remaining = length
+
+    def readable(self) -> bool:
+        """Return whether the reader is readable."""
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        """Read bytes into a buffer, never past the length."""
+        size = min(len(buffer), self.remaining)
+        if size <= 0:
+            return 0
+        data = self.fp.read(size)
+        buffer[: len(data)] = data
+        self.remaining -= len(data)
+        return len(data)
+
+
+class Metrics:
+    """Define the request-level metrics of the server."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.in_flight = 0
+        self.paths: Dict[str, Dict[str, Any]] = {}
+
+    def begin(self) -> None:
+        """Record the start of a request."""
+        with self._lock:
+            self.in_flight += 1
+
+    def end(
+        self, path: str, status: int, duration: float, bytes_in: int, bytes_out: int
+    ) -> None:
+        """Record the end of a request."""
+        with self._lock:
+            self.in_flight -= 1
+            stats = self.paths.setdefault(
+                path,
+                dict(
+                    requests=0,
+                    client_errors=0,
+                    server_errors=0,
+                    bytes_in=0,
+                    bytes_out=0,
+                    duration_total=0.0,
+                    duration_max=0.0,
+                ),
+            )
+            stats["requests"] += 1
+            stats["client_errors"] += int(400 <= status < 500)
+            stats["server_errors"] += int(status >= 500)
+            stats["bytes_in"] += bytes_in
+            stats["bytes_out"] += bytes_out
+            stats["duration_total"] += duration
+            stats["duration_max"] = max(stats["duration_max"], duration)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert metrics to dict."""
+        with self._lock:
+            return dict(
+                uptime=time.time() - self.started,
+                in_flight=self.in_flight,
+                paths={path: dict(stats) for path, stats in self.paths.items()},
+            )
+
+
+class ConvertServer(ThreadingHTTPServer):
+    """Define the conversion server with a warm worker pool."""
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        ctx: ConvertContext,
+        workers: int = 4,
+        max_body_size: int = DEFAULT_MAX_BODY_SIZE,
+    ) -> None:
+        """Initialize the server."""
+        super().__init__(address, ConvertHandler)
+        self.ctx = ctx
+        self.max_body_size = max_body_size
+        self.metrics = Metrics()
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="har2code")
+
+    def process_request(self, request, client_address):
+        """Handle the request in the worker pool."""
+        self.pool.submit(self.process_request_thread, request, client_address)
+
+    def server_close(self) -> None:
+        """Close the server and the worker pool."""
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+
+class ConvertHandler(BaseHTTPRequestHandler):
+    """
+    Define the request handler of the conversion server.
+
+    POST /convert returns the generated code only: the out/ files it references are
+    not kept, POST /archive returns a zip of the generated code as main.py and of
+    the extracted bodies under out/. GET /metrics returns the metrics.
+    Query parameters: library, collapse, no_files. Uploads are read as a stream
+    and must have a Content-Length of at most the server max_body_size.
+    """
+
+    server: ConvertServer
+
+    def do_GET(self) -> None:
+        """Handle GET requests."""
+        self._handle(self._metrics)
+
+    def do_POST(self) -> None:
+        """Handle POST requests."""
+        self._handle(self._convert)
+
+    def _content_length(self) -> int:
+        """Parse the Content-Length header, 0 when missing."""
+        value = self.headers.get("Content-Length")
+        if value is None:
+            return 0
+        if not (value.isascii() and value.isdigit()):
+            raise ValueError(f"Invalid Content-Length: {value!r}")
+        return int(value)
+
+    def _handle(self, handler) -> None:
+        """Handle a request and record its metrics."""
+        path = urlparse(self.path).path
+        self.server.metrics.begin()
+        start = time.perf_counter()
+        status, content_type = HTTPStatus.INTERNAL_SERVER_ERROR, "text/plain"
+        body = b""
+        bytes_in = 0
+        try:
+            bytes_in = self._content_length()
+            status, content_type, body = handler(path, bytes_in)
+        except (ValueError, DaciteError) as e:
+            self.close_connection = True
+            status, content_type = HTTPStatus.BAD_REQUEST, "text/plain"
+            body = f"{type(e).__name__}: {e}".encode()
+        except Exception as e:
+            self.close_connection = True
+            self.log_error("Conversion failed: %r", e)
+            status, content_type = HTTPStatus.INTERNAL_SERVER_ERROR, "text/plain"
+            body = b"Internal Server Error"
+        finally:
+            # unknown paths share one entry, so that metrics stay bounded
+            self.server.metrics.end(
+                path if path in ROUTES else "other",
+                status,
+                time.perf_counter() - start,
+                bytes_in,
+                len(body),
+            )
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _metrics(self, path: str, bytes_in: int) -> Tuple[int, str, bytes]:
+        """Return the metrics."""
+        if path != "/metrics":
+            return HTTPStatus.NOT_FOUND, "text/plain", b"Not Found"
+        body = json.dumps(self.server.metrics.to_dict()).encode()
+        return HTTPStatus.OK, "application/json", body
+
+    def _convert(self, path: str, bytes_in: int) -> Tuple[int, str, bytes]:
+        """Convert the uploaded HAR stream."""
+        if path not in ("/convert", "/archive"):
+            return HTTPStatus.NOT_FOUND, "text/plain", b"Not Found"
+
+        query = {k: v[-1] for k, v in parse_qs(urlparse(self.path).query).items()}
+        library = query.get("library", "requests")
+        collapse = query.get("collapse", "none")
+        if collapse not in COLLAPSE_MODES:
+            raise ValueError(f"Unknown collapse mode: {collapse}")
+
+        if "Content-Length" not in self.headers:
+            return HTTPStatus.LENGTH_REQUIRED, "text/plain", b"Length Required"
+        if bytes_in > self.server.max_body_size:
+            self.close_connection = True
+            return HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "text/plain", b"Too Large"
+
+        stream = io.BufferedReader(BoundedReader(self.rfile, bytes_in))
+        with tempfile.TemporaryDirectory(prefix="har2code-") as tmp:
+            output = Path(tmp) / "out"
+            changes: Dict[str, Any] = dict(output=output, location=Path("out"))
+            if "no_files" in query:
+                changes["exclude_exts"] = exts_type(query["no_files"])
+            ctx = self.server.ctx.fork(**changes)
+            codes = collapse_codes(ctx.parse_codes(stream), collapse)
+            script = code_to_str(codes, library)
+            if path == "/convert":
+                return HTTPStatus.OK, "text/x-python", script.encode()
+
+            archive = io.BytesIO()
+            with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+                zf.writestr("main.py", script)
+                if output.exists():
+                    for file in sorted(output.iterdir()):
+                        zf.write(file, f"out/{file.name}")
+            return HTTPStatus.OK, "application/zip", archive.getvalue()
+
+
+def main():
+    """Serve HAR to Python code conversions."""
+    parser = argparse.ArgumentParser(
+        description="Serve HAR to Python code conversions over localhost HTTP."
+    )
+    parser.add_argument(
+        "--host", default="127.0.0.1", help="Host to bind. Default is 127.0.0.1."
+    )
+    parser.add_argument(
+        "--port", type=int, default=8765, help="Port to bind. Default is 8765."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Number of worker threads. Default is 4.",
+    )
+    parser.add_argument(
+        "--no-files",
+        type=exts_type,
+        default="json",
+        help=(
+            "Default file extension of the response content to be not saved. "
+            "etc. json,js; Default is json."
+        ),
+    )
+    parser.add_argument(
+        "--fallback-mime-map",
+        default=".fallback_mime_map.json",
+        help="Path to a custom JSON file defining MIME type -> file extension.",
+    )
+    parser.add_argument(
+        "--max-body-size",
+        type=int,
+        default=DEFAULT_MAX_BODY_SIZE,
+        help=(
+            "Maximum size in bytes of an uploaded HAR file. "
+            f"Default is {DEFAULT_MAX_BODY_SIZE}."
+        ),
+    )
+    args = parser.parse_args()
+    ctx = ConvertContext.from_options(
+        args.fallback_mime_map, exclude_exts=args.no_files
+    )
+
+    with ConvertServer(
+        (args.host, args.port), ctx, args.workers, args.max_body_size
+    ) as server:
+        print(f"Serving on http://{args.host}:{server.server_port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
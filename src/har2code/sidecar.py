@@ -0,0 +1,66 @@
+"""Externalize large request payloads into a sidecar data file."""
+
+import json
+from pathlib import Path
+from typing import Any, List, Optional, Tuple, Union
+
+DEFAULT_THRESHOLD = 4096
+
+
+class Sidecar:
+    """
+    Define a JSON lines sidecar data file.
+
+    Payloads whose JSON encoding is at least `threshold` bytes are appended as one
+    line each, and are addressed by their byte offset and length.
+    """
+
+    def __init__(
+        self, path: Union[str, Path], threshold: int = DEFAULT_THRESHOLD
+    ) -> None:
+        """Open the sidecar data file for writing."""
+        self.path = Path(path)
+        self.threshold = threshold
+        self.offset = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fp = open(self.path, "wb")
+
+    def store(self, value: Any) -> Optional[Tuple[int, int]]:
+        """Store a payload, return its offset and length if externalized."""
+        raw = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+        if len(raw) < self.threshold:
+            return None
+        offset = self.offset
+        self._fp.write(raw + b"\n")
+        self.offset += len(raw) + 1
+        return offset, len(raw)
+
+    def close(self) -> None:
+        """Close the sidecar data file."""
+        self._fp.close()
+
+    def __enter__(self) -> "Sidecar":
+        """Enter the context."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Exit the context."""
+        self.close()
+
+
+def to_loader(sidecar: Sidecar) -> List[str]:
+    """Convert the payload loader of the generated code to string."""
+    code_str = []
+    code_str.append("from json import loads as _loads")
+    code_str.append("")
+    code_str.append(f"PAYLOADS = {str(sidecar.path)!r}")
+    code_str.append("")
+    code_str.append("")
+    code_str.append("def load_payload(offset, length):")
+    code_str.append('    """Load a payload from the sidecar data file."""')
+    code_str.append('    with open(PAYLOADS, "rb") as fp:')
+    code_str.append("        fp.seek(offset)")
+    code_str.append("        return _loads(fp.read(length))")
+    code_str.append("")
+    code_str.append("")
+    return code_str
@@ -0,0 +1,311 @@
+"""Store converted HAR entries and bodies in SQLite."""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urlparse
+
+from .context import ConvertContext, HarSource
+from .models import code, har
+from .tostr import code_to_str
+
+DEFAULT_BATCH_SIZE = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    datetime TEXT NOT NULL,
+    time TEXT NOT NULL,
+    method TEXT NOT NULL,
+    url TEXT NOT NULL,
+    host TEXT NOT NULL,
+    path TEXT NOT NULL,
+    status INTEGER,
+    http_version TEXT,
+    headers TEXT,
+    cookies TEXT,
+    params TEXT,
+    data TEXT,
+    json TEXT,
+    files TEXT,
+    response_headers TEXT,
+    content TEXT
+);
+CREATE INDEX IF NOT EXISTS entries_timestamp ON entries (timestamp);
+CREATE INDEX IF NOT EXISTS entries_host_path ON entries (host, path);
+CREATE INDEX IF NOT EXISTS entries_method ON entries (method);
+CREATE INDEX IF NOT EXISTS entries_status ON entries (status);
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256 TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entry_blobs (
+    entry_id INTEGER NOT NULL REFERENCES entries (id),
+    sha256 TEXT NOT NULL REFERENCES blobs (sha256),
+    filename TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entry_blobs_entry_id ON entry_blobs (entry_id);
+"""
+
+ENTRY_COLUMNS = [
+    "id",
+    "timestamp",
+    "datetime",
+    "time",
+    "method",
+    "url",
+    "host",
+    "path",
+    "status",
+    "http_version",
+    "headers",
+    "cookies",
+    "params",
+    "data",
+    "json",
+    "files",
+    "response_headers",
+    "content",
+]
+
+
+def _dumps(value: Any) -> str:
+    """Convert value to JSON text."""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+class SqliteStore:
+    """Define the SQLite database of converted entries and bodies."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        """Open the database and create the schema."""
+        self.path = Path(path)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the database."""
+        self.conn.close()
+
+    def __enter__(self) -> "SqliteStore":
+        """Enter the context."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Exit the context."""
+        self.close()
+
+    def put_blob(self, raw: bytes) -> str:
+        """Store a deduplicated body, return its SHA-256."""
+        sha = hashlib.sha256(raw).hexdigest()
+        self.conn.execute(
+            "INSERT OR IGNORE INTO blobs (sha256, data) VALUES (?, ?)", (sha, raw)
+        )
+        return sha
+
+    def write(
+        self,
+        ctx: "SqliteContext",
+        source: HarSource,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> int:
+        """Convert a HAR path or stream into the database, return the entry count."""
+        (next_id,) = self.conn.execute(
+            "SELECT COALESCE(MAX(id), 0) + 1 FROM entries"
+        ).fetchone()
+        entries: List[Tuple[Any, ...]] = []
+        links: List[Tuple[int, str, str]] = []
+        count = 0
+
+        for c in ctx.iter_codes(source):
+            entries.append(self._entry_row(next_id + count, c))
+            links.extend((next_id + count, sha, name) for sha, name in ctx.saved)
+            ctx.saved.clear()
+            count += 1
+            if len(entries) >= batch_size:
+                self._flush(entries, links)
+        self._flush(entries, links)
+        return count
+
+    def _flush(
+        self, entries: List[Tuple[Any, ...]], links: List[Tuple[int, str, str]]
+    ) -> None:
+        """Insert a batch of entries in one transaction."""
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO entries ({', '.join(ENTRY_COLUMNS)}) "  # nosec B608
+                f"VALUES ({', '.join('?' * len(ENTRY_COLUMNS))})",
+                entries,
+            )
+            self.conn.executemany(
+                "INSERT INTO entry_blobs (entry_id, sha256, filename) VALUES (?, ?, ?)",
+                links,
+            )
+        entries.clear()
+        links.clear()
+
+    @staticmethod
+    def _entry_row(entry_id: int, c: code.PythonCode) -> Tuple[Any, ...]:
+        """Convert Python code to an entries row."""
+        request, response = c.request, c.response
+        url = urlparse(request.url)
+        return (
+            entry_id,
+            c.timestamp,
+            c.datetime,
+            c.time,
+            request.method,
+            request.url,
+            url.netloc,
+            url.path,
+            response.status,
+            response.httpVersion,
+            _dumps(request.headers),
+            _dumps([asdict(cookie) for cookie in request.cookies]),
+            _dumps(request.params),
+            _dumps(request.data),
+            _dumps(request.json),
+            _dumps({k: asdict(v) for k, v in (request.files or {}).items()}),
+            _dumps([asdict(header) for header in response.headers]),
+            response.content,
+        )
+
+    @staticmethod
+    def _entry_code(row: Sequence[Any]) -> code.PythonCode:
+        """Convert an entries row to Python code."""
+        values = dict(zip(ENTRY_COLUMNS, row))
+        files = json.loads(values["files"])
+        return code.PythonCode(
+            timestamp=values["timestamp"],
+            time=values["time"],
+            datetime=values["datetime"],
+            request=code.Request(
+                method=values["method"],
+                url=values["url"],
+                headers=json.loads(values["headers"]),
+                cookies=[code.Cookie(**c) for c in json.loads(values["cookies"])],
+                params=json.loads(values["params"]),
+                data=json.loads(values["data"]),
+                json=json.loads(values["json"]),
+                files={k: code.Flie(**v) for k, v in files.items()},
+            ),
+            response=code.Response(
+                status=values["status"],
+                httpVersion=values["http_version"],
+                headers=[
+                    har.Header(**h) for h in json.loads(values["response_headers"])
+                ],
+                content=values["content"],
+            ),
+        )
+
+    def iter_codes(
+        self,
+        where: str = "1",
+        params: Sequence[Any] = (),
+        limit: Optional[int] = None,
+        materialize: bool = True,
+    ) -> Iterator[code.PythonCode]:
+        """
+        Yield Python code for the entries matched by a SQL condition.
+
+        With materialize, the bodies referenced by the entries are written back
+        to their file names so the generated code can run.
+        """
+        sql = (
+            f"SELECT {', '.join(ENTRY_COLUMNS)} FROM entries "  # nosec B608
+            f"WHERE {where} ORDER BY timestamp"
+        )
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        for row in self.conn.execute(sql, params):
+            if materialize:
+                self.materialize(row[0])
+            yield self._entry_code(row)
+
+    def materialize(self, entry_id: int) -> None:
+        """Write the bodies of an entry to their file names."""
+        for filename, raw in self.conn.execute(
+            "SELECT entry_blobs.filename, blobs.data FROM entry_blobs "
+            "JOIN blobs USING (sha256) WHERE entry_blobs.entry_id = ?",
+            (entry_id,),
+        ):
+            path = Path(filename)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(raw)
+
+
+@dataclass
+class SqliteContext(ConvertContext):
+    """Define a conversion context saving every body as a SQLite blob."""
+
+    exclude_exts: List[str] = field(default_factory=list)
+    store: Optional[SqliteStore] = None
+
+    saved: List[Tuple[str, str]] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+
+    def save_body(self, name: str, raw: bytes) -> str:
+        """Save a body as a deduplicated blob, return its file name."""
+        if self.store is None:
+            raise ValueError("SqliteContext requires a store")
+        sha = self.store.put_blob(raw)
+        filename = self.locate(name)
+        self.saved.append((sha, filename))
+        return filename
+
+
+def main():
+    """Generate Python code for the entries of a SQLite database."""
+    parser = argparse.ArgumentParser(
+        description="Generate Python code for the entries of a SQLite database."
+    )
+    parser.add_argument("database", help="Path to the SQLite database.")
+    parser.add_argument(
+        "--where",
+        default="1",
+        help=(
+            'SQL condition on the entries table, e.g. "host = ? AND status >= ?". '
+            "Columns: " + ", ".join(ENTRY_COLUMNS) + ". Default matches all entries."
+        ),
+    )
+    parser.add_argument(
+        "--param",
+        action="append",
+        default=[],
+        help="Parameter bound to a ? placeholder of --where. Can be repeated.",
+    )
+    parser.add_argument(
+        "--limit", type=int, default=None, help="Maximum number of entries."
+    )
+    parser.add_argument(
+        "--library",
+        choices=["requests", "httpx"],
+        default="requests",
+        help="Python library to use for the generated code. Default is requests.",
+    )
+    parser.add_argument(
+        "--no-bodies",
+        action="store_true",
+        help="Do not write the bodies referenced by the matched entries.",
+    )
+    args = parser.parse_args()
+
+    with SqliteStore(args.database) as store:
+        codes = list(
+            store.iter_codes(
+                args.where, args.param, args.limit, materialize=not args.no_bodies
+            )
+        )
+    print(code_to_str(codes, args.library))
+
+
+if __name__ == "__main__":
+    main()
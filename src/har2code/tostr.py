@@ -1,16 +1,21 @@
 """Convert HAR data to Python code string."""
 
-from typing import List
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
 
 from .models import code as py_code
+from .sidecar import Sidecar, to_loader
 
 
-def code_to_str(codes: List[py_code.PythonCode], library: str = "httpx") -> str:
+def code_to_str(
+    codes: List[py_code.PythonCode],
+    library: str = "httpx",
+    sidecar: Optional[Sidecar] = None,
+) -> str:
     """Convert code to string."""
     if library == "httpx":
-        return to_httpx(codes)
+        return to_httpx(codes, sidecar)
     elif library == "requests":
-        return to_requests(codes)
+        return to_requests(codes, sidecar)
     else:
         raise ValueError(f"Unknown library: {library}")
 
@@ -31,32 +36,32 @@ def to_response(response: py_code.Response) -> List[str]:
     return code_str
 
 
-def to_request(request: py_code.Request) -> List[str]:
+def to_payload(name: str, value: Any, sidecar: Optional[Sidecar] = None) -> str:
+    """Convert payload assignment to string, externalizing large payloads."""
+    if not value:
+        return f"{name} = None"
+    if sidecar is not None:
+        location = sidecar.store(value)
+        if location is not None:
+            offset, length = location
+            return f"{name} = load_payload({offset}, {length})"
+    return f"{name} = {value!r}"
+
+
+def to_request(
+    request: py_code.Request, sidecar: Optional[Sidecar] = None
+) -> List[str]:
     """Convert request to string."""
     code_str = []
     code_str.append(f'url = "{request.url}"')
-    if request.headers:
-        code_str.append(f"headers = {request.headers!r}")
-    else:
-        code_str.append("headers = None")
+    code_str.append(to_payload("headers", request.headers, sidecar))
     if request.cookies:
         code_str.append(f"cookies = {request.cookies!r}")
     else:
         code_str.append("cookies = None")
-    if request.params:
-        code_str.append(f"params = {request.params!r}")
-    else:
-        code_str.append("params = None")
-
-    if request.data:
-        code_str.append(f"data = {request.data!r}")
-    else:
-        code_str.append("data = None")
-
-    if request.json:
-        code_str.append(f"json = {request.json!r}")
-    else:
-        code_str.append("json = None")
+    code_str.append(to_payload("params", request.params, sidecar))
+    code_str.append(to_payload("data", request.data, sidecar))
+    code_str.append(to_payload("json", request.json, sidecar))
 
     if request.files:
         code_str.append(f"files = {request.files!r}")
@@ -65,6 +70,33 @@ def to_request(request: py_code.Request) -> List[str]:
     return code_str
 
 
+def to_call(code: py_code.PythonCode, call: str, indent: str = "") -> List[str]:
+    """Convert request call to string, looping over repeated requests."""
+    code_str = []
+    if code.repeat > 1:
+        code_str.append(f"{indent}for i in range({code.repeat}):")
+        code_str.append(f"{indent}    if i:")
+        code_str.append(f"{indent}        time.sleep({code.interval:.3f})")
+        code_str.append(f"{indent}    {call}")
+    else:
+        code_str.append(f"{indent}{call}")
+    return code_str
+
+
+def to_imports(
+    library: str, sidecar: Optional[Sidecar] = None, timed: bool = False
+) -> List[str]:
+    """Convert imports to string."""
+    code_str = []
+    if timed:
+        code_str.append("import time")
+        code_str.append("")
+    code_str.append(f"import {library}")
+    if sidecar is not None:
+        code_str.extend(to_loader(sidecar))
+    return code_str
+
+
 def to_code_head(code: py_code.PythonCode) -> List[str]:
     """Convert code head to string."""
     code_str = []
@@ -72,6 +104,8 @@ def to_code_head(code: py_code.PythonCode) -> List[str]:
     code_str.append(f"# timestamp: {code.timestamp}")
     code_str.append(f"# time: {code.time}")
     code_str.append(f"# datetime: {code.datetime}")
+    if code.repeat > 1:
+        code_str.append(f"# repeat: {code.repeat}, interval: {code.interval:.3f}s")
     code_str.append("#")
     return code_str
 
@@ -84,54 +118,102 @@ def to_code_tail(code: py_code.PythonCode) -> List[str]:
     return code_str
 
 
-def to_httpx(codes: List[py_code.PythonCode]) -> str:
-    """Convert HAR data to Python httpx code."""
+def to_httpx_code(
+    code: py_code.PythonCode, sidecar: Optional[Sidecar] = None
+) -> List[str]:
+    """Convert one code to Python httpx code."""
     code_str = []
-    code_str.append("import httpx")
-    for code in codes:
-        request = code.request
-        response = code.response
-
-        # code head
-        code_str.extend(to_code_head(code))
-
-        # request
-        code_str.extend(to_request(request))
-        code_str.append("with httpx.Client() as client:")
-        code_str.append(
-            f'    response = client.request("{request.method}", url, headers=headers, '
-            f"cookies=cookies, params=params, data=data, json=json, files=files)"
+    request = code.request
+    response = code.response
+
+    # code head
+    code_str.extend(to_code_head(code))
+
+    # request
+    code_str.extend(to_request(request, sidecar))
+    code_str.append("with httpx.Client() as client:")
+    code_str.extend(
+        to_call(
+            code,
+            f'response = client.request("{request.method}", url, '
+            "headers=headers, cookies=cookies, params=params, data=data, "
+            "json=json, files=files)",
+            indent="    ",
         )
+    )
 
-        # response
-        code_str.extend(to_response(response))
+    # response
+    code_str.extend(to_response(response))
 
-        # code tail
-        code_str.extend(to_code_tail(code))
-    return "\n".join(code_str)
+    # code tail
+    code_str.extend(to_code_tail(code))
+    return code_str
 
 
-def to_requests(codes: List[py_code.PythonCode]) -> str:
-    """Convert HAR data to Python requests code."""
+def to_requests_code(
+    code: py_code.PythonCode, sidecar: Optional[Sidecar] = None
+) -> List[str]:
+    """Convert one code to Python requests code."""
     code_str = []
-    code_str.append("import requests")
+    request = code.request
+    response = code.response
+
+    # code head
+    code_str.extend(to_code_head(code))
+
+    # request
+    code_str.extend(to_request(request, sidecar))
+    code_str.extend(
+        to_call(
+            code,
+            f'response = requests.request("{request.method}", url, '
+            "headers=headers, cookies=cookies, params=params, data=data, "
+            "json=json, files=files)",
+        )
+    )
+
+    # response
+    code_str.extend(to_response(response))
+
+    # code tail
+    code_str.extend(to_code_tail(code))
+    return code_str
+
+
+LIBRARIES: Dict[str, Callable[..., List[str]]] = {
+    "httpx": to_httpx_code,
+    "requests": to_requests_code,
+}
+
+
+def iter_code_str(
+    codes: Iterable[py_code.PythonCode],
+    library: str = "httpx",
+    sidecar: Optional[Sidecar] = None,
+    timed: bool = False,
+) -> Iterator[str]:
+    """
+    Yield the code string chunk by chunk, the imports first then one per code.
+
+    timed must be set when a code repeats, so that time is imported.
+    """
+    if library not in LIBRARIES:
+        raise ValueError(f"Unknown library: {library}")
+    to_code = LIBRARIES[library]
+    yield "\n".join(to_imports(library, sidecar, timed))
     for code in codes:
-        request = code.request
-        response = code.response
+        yield "\n".join(to_code(code, sidecar))
 
-        # code head
-        code_str.extend(to_code_head(code))
 
-        # request
-        code_str.extend(to_request(request))
-        code_str.append(
-            f'response = requests.request("{request.method}", url, headers=headers, '
-            f"cookies=cookies, params=params, data=data, json=json, files=files)"
-        )
+def to_httpx(codes: List[py_code.PythonCode], sidecar: Optional[Sidecar] = None) -> str:
+    """Convert HAR data to Python httpx code."""
+    timed = any(code.repeat > 1 for code in codes)
+    return "\n".join(iter_code_str(codes, "httpx", sidecar, timed))
 
-        # response
-        code_str.extend(to_response(response))
 
-        # code tail
-        code_str.extend(to_code_tail(code))
-    return "\n".join(code_str)
+def to_requests(
+    codes: List[py_code.PythonCode], sidecar: Optional[Sidecar] = None
+) -> str:
+    """Convert HAR data to Python requests code."""
+    timed = any(code.repeat > 1 for code in codes)
+    return "\n".join(iter_code_str(codes, "requests", sidecar, timed))
@@ -0,0 +1,117 @@
+"""Tests for context module."""
+
+import io
+import json
+import threading
+
+import pytest
+
+from har2code import ConvertContext
+
+
+def make_entry(url, started="2024-01-01T00:00:00.000Z", mime="image/png"):
+    """Build a HAR entry returning a body of the given MIME type."""
+    return {
+        "startedDateTime": started,
+        "time": 10,
+        "request": {
+            "method": "GET",
+            "url": url,
+            "httpVersion": "HTTP/1.1",
+            "cookies": [],
+            "headers": [],
+            "queryString": [],
+            "headersSize": -1,
+            "bodySize": 0,
+        },
+        "response": {
+            "status": 200,
+            "httpVersion": "HTTP/1.1",
+            "cookies": [],
+            "headers": [],
+            "content": {"size": 3, "mimeType": mime, "text": "png"},
+            "headersSize": -1,
+            "bodySize": 3,
+        },
+        "cache": {},
+        "timings": {},
+    }
+
+
+def make_har(*entries):
+    """Build HAR data of the given entries."""
+    return {"log": {"entries": list(entries)}}
+
+
+def test_iter_codes(tmp_path):
+    """Test codes are yielded from a stream into the context output."""
+    ctx = ConvertContext(output=tmp_path / "out", exclude_exts=[])
+    har = make_har(make_entry("https://example.com/logo.png"))
+
+    codes = list(ctx.iter_codes(io.StringIO(json.dumps(har))))
+
+    assert len(codes) == 1
+    assert codes[0].request.url == "https://example.com/logo.png"
+    assert len(list((tmp_path / "out").glob("binary-*.png"))) == 1
+
+
+def test_merge_codes(tmp_path):
+    """Test sources are reordered within the window and merged by timestamp."""
+    ctx = ConvertContext(output=tmp_path / "out", exclude_exts=[])
+
+    def source(*seconds):
+        entries = [
+            make_entry(f"https://example.com/{s}.png", f"2024-01-01T00:00:{s:02d}.000Z")
+            for s in seconds
+        ]
+        return io.StringIO(json.dumps(make_har(*entries)))
+
+    def urls(codes):
+        return [int(c.request.url.rsplit("/", 1)[1][:-4]) for c in codes]
+
+    codes = ctx.merge_codes([source(1, 5, 4), source(3, 2, 6)], window=1)
+    assert urls(codes) == [1, 2, 3, 4, 5, 6]
+
+    codes = ctx.merge_codes([source(5, 1, 4), source(3, 2, 6)], window=None)
+    assert urls(codes) == [1, 2, 3, 4, 5, 6]
+
+    with pytest.raises(ValueError, match="out of order by more than 1 entries"):
+        list(ctx.merge_codes([source(5, 4, 1), source(2)], window=1))
+
+
+def test_parallel_contexts(tmp_path):
+    """Test contexts with their own output and MIME map convert in parallel."""
+    har = json.dumps(
+        make_har(
+            *[
+                make_entry(f"https://example.com/blob/{i}", mime="application/x-blob")
+                for i in range(50)
+            ]
+        )
+    )
+    contexts = [
+        ConvertContext(
+            output=tmp_path / f"out-{i}",
+            exclude_exts=[],
+            mime_map={"application/x-blob": f".blob{i}"},
+        )
+        for i in range(4)
+    ]
+    barrier = threading.Barrier(len(contexts))
+    counts = {}
+
+    def convert(i):
+        barrier.wait()
+        counts[i] = len(list(contexts[i].iter_codes(io.StringIO(har))))
+
+    threads = [threading.Thread(target=convert, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counts == {i: 50 for i in range(4)}
+    for i in range(4):
+        files = list((tmp_path / f"out-{i}").glob("binary-*"))
+        assert len(files) == 50
+        assert {file.suffix for file in files} == {f".blob{i}"}
@@ -0,0 +1,64 @@
+"""Tests for dedup module."""
+
+from har2code.dedup import collapse_codes
+from har2code.models import code
+from har2code.tostr import code_to_str
+
+
+def make_code(timestamp, url="https://example.com/poll", request_id="1", method="GET"):
+    """Build a python code for the given request."""
+    return code.PythonCode(
+        timestamp=timestamp,
+        time="",
+        datetime="",
+        request=code.Request(
+            method=method,
+            url=url,
+            headers={"Accept": "*/*", "X-Request-Id": request_id},
+            cookies=[],
+            params={},
+            data=None,
+            json=None,
+            files=None,
+        ),
+        response=code.Response(status=200, httpVersion="", headers=[], content=""),
+    )
+
+
+def test_collapse_loop():
+    """Test polling requests are collapsed into one loop."""
+    codes = [make_code(i * 2.0, request_id=str(i)) for i in range(4)]
+    codes.append(make_code(7.0, url="https://example.com/other"))
+
+    collapsed = collapse_codes(codes, "loop")
+
+    assert len(collapsed) == 2
+    assert collapsed[0].repeat == 4
+    assert collapsed[0].interval == 2.0
+    assert collapsed[1].repeat == 1
+
+
+def test_collapse_drop():
+    """Test duplicated requests are dropped."""
+    codes = [make_code(i * 2.0, request_id=str(i)) for i in range(4)]
+
+    collapsed = collapse_codes(codes, "drop")
+
+    assert len(collapsed) == 1
+    assert collapsed[0].repeat == 1
+
+
+def test_collapse_interleaved():
+    """Test a request to the same host ends a run of polling requests."""
+    codes = [make_code(0.0, request_id="0"), make_code(2.0, request_id="2")]
+    codes.append(make_code(3.0, url="https://example.com/login", method="POST"))
+    codes.append(make_code(4.0, request_id="4"))
+
+    for mode in ["loop", "drop"]:
+        paths = [c.request.url.rsplit("/", 1)[1] for c in collapse_codes(codes, mode)]
+        assert paths == ["poll", "login", "poll"]
+
+    collapsed = collapse_codes(codes, "loop")
+    assert [c.repeat for c in collapsed] == [2, 1, 1]
+    script = code_to_str(collapsed, "requests")
+    assert "    if i:\n        time.sleep(2.000)\n" in script
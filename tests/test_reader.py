@@ -0,0 +1,35 @@
+"""Tests for reader module."""
+
+import io
+import json
+
+from har2code.reader import iter_har_entries
+
+
+def test_iter_har_entries():
+    """Test entries are decoded one at a time across chunk boundaries."""
+    entries = [
+        {"startedDateTime": f"2024-01-01T00:00:0{i}Z", "time": i} for i in range(5)
+    ]
+    har = {
+        "log": {
+            "version": "1.2",
+            "pages": [{"title": '"entries": []'}],
+            "entries": entries,
+            "comment": 12345,
+        }
+    }
+    text = json.dumps(har, indent=2)
+
+    for chunk_size in [1, 7, 1 << 16]:
+        assert list(iter_har_entries(io.StringIO(text), chunk_size)) == entries
+    assert list(iter_har_entries(io.StringIO('{"log": {"entries": []}}'))) == []
+
+
+def test_iter_har_entries_truncated_numbers():
+    """Test numbers split across chunk boundaries are decoded whole."""
+    text = '{"log": {"x": 0.5, "entries": [{"time": 0.5}, {"time": -1.5e3}]}}'
+
+    for chunk_size in [1, 4, 8, 16]:
+        entries = list(iter_har_entries(io.StringIO(text), chunk_size))
+        assert entries == [{"time": 0.5}, {"time": -1500.0}]
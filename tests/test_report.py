@@ -0,0 +1,79 @@
+"""Tests for report module."""
+
+import io
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from har2code.report import (  # noqa: E402
+    build_report,
+    group_stats,
+    load_columns,
+    write_csv,
+)
+
+
+def make_entry(url, time, timings=None, status=200):
+    """Build a HAR entry with the given time, phase timings and status."""
+    return {
+        "startedDateTime": "2024-01-01T00:00:00.000Z",
+        "time": time,
+        "request": {"method": "GET", "url": url, "bodySize": 0},
+        "response": {"status": status, "bodySize": 3, "content": {"size": 3}},
+        "timings": timings or {},
+    }
+
+
+def make_har(*entries):
+    """Build HAR data of the given entries."""
+    return {"log": {"entries": list(entries)}}
+
+
+def test_group_stats():
+    """Test per-group percentiles match numpy, NaN values ignored."""
+    ids = np.array([0, 0, 0, 0, 1, 1, 1], dtype=np.int32)
+    values = np.array([4.0, 1.0, 3.0, 2.0, 10.0, np.nan, 30.0])
+
+    stats = group_stats(ids, 3, values)
+
+    assert stats["count"].tolist() == [4, 2, 0]
+    assert stats["p50"][0] == np.percentile([1, 2, 3, 4], 50)
+    assert stats["p90"][1] == pytest.approx(np.percentile([10, 30], 90))
+    assert stats["mean"][1] == 20.0
+    assert stats["max"][0] == 4.0
+    assert np.isnan(stats["p99"][2])
+
+
+def test_build_report():
+    """Test the report of entries with NaN and -1 timings, and of no entries."""
+    har = make_har(
+        make_entry(
+            "https://a.com/x", time=30, timings={"dns": -1, "wait": 20, "send": 1}
+        ),
+        make_entry("https://a.com/x", time=10, timings={"dns": 2, "wait": 5}),
+        make_entry("https://b.com/y", time=float("nan"), status=500),
+    )
+
+    report = build_report(load_columns([io.StringIO(json.dumps(har))]), top=5)
+
+    assert report["entries"] == 3
+    assert report["status"] == {"200": 2, "500": 1}
+    assert [row["time"] for row in report["slowest"]] == [30.0, 10.0, None]
+    host_a, host_b = report["hosts"]
+    assert (host_a["key"], host_a["count"], host_a["time_max"]) == ("a.com", 2, 30.0)
+    assert host_a["dns_mean"] == 2.0
+    assert host_a["wait_p50"] == 12.5
+    assert (host_b["count"], host_b["time_p90"]) == (1, None)
+    fp = io.StringIO()
+    write_csv(report, fp)
+    assert len(fp.getvalue().splitlines()) == 1 + 2 + 2
+
+    empty = build_report(load_columns([io.StringIO(json.dumps(make_har()))]))
+    assert empty["entries"] == 0
+    assert empty["slowest"] == []
+    assert empty["response_sizes"]["total"] == 0
+    fp = io.StringIO()
+    write_csv(empty, fp)
+    assert fp.getvalue() == ""
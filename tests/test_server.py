@@ -0,0 +1,131 @@
+"""Tests for server module."""
+
+import io
+import json
+import threading
+import zipfile
+from http.client import HTTPConnection
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from har2code import ConvertContext
+from har2code.server import ConvertServer
+
+
+def make_har(url):
+    """Build HAR data of one entry returning a PNG body."""
+    entry = {
+        "startedDateTime": "2024-01-01T00:00:00.000Z",
+        "time": 10,
+        "request": {
+            "method": "GET",
+            "url": url,
+            "httpVersion": "HTTP/1.1",
+            "cookies": [],
+            "headers": [],
+            "queryString": [],
+            "headersSize": -1,
+            "bodySize": 0,
+        },
+        "response": {
+            "status": 200,
+            "httpVersion": "HTTP/1.1",
+            "cookies": [],
+            "headers": [],
+            "content": {"size": 3, "mimeType": "image/png", "text": "png"},
+            "headersSize": -1,
+            "bodySize": 3,
+        },
+        "cache": {},
+        "timings": {},
+    }
+    return {"log": {"entries": [entry]}}
+
+
+@pytest.fixture
+def server_url(tmp_path):
+    """Serve conversions on a free port, return the base URL."""
+    ctx = ConvertContext(output=tmp_path / "out", exclude_exts=[])
+    with ConvertServer(("127.0.0.1", 0), ctx, workers=2, max_body_size=4096) as server:
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield f"http://127.0.0.1:{server.server_port}"
+        finally:
+            server.shutdown()
+
+
+def test_convert(server_url):
+    """Test HAR uploads are converted and recorded in the metrics."""
+    body = json.dumps(make_har("https://example.com/a")).encode()
+    with urlopen(f"{server_url}/convert?library=httpx", data=body) as response:
+        script = response.read().decode()
+    with urlopen(f"{server_url}/metrics") as response:
+        metrics = json.load(response)
+
+    assert script.startswith("import httpx")
+    assert 'url = "https://example.com/a"' in script
+    assert metrics["paths"]["/convert"]["requests"] == 1
+    assert metrics["paths"]["/convert"]["client_errors"] == 0
+
+
+def test_convert_too_large(server_url):
+    """Test uploads larger than the maximum body size are rejected."""
+    with pytest.raises(HTTPError) as e:
+        urlopen(f"{server_url}/convert", data=b" " * 8192)
+
+    assert e.value.code == 413
+
+
+def test_convert_errors(server_url, monkeypatch):
+    """Test invalid uploads are client errors and failures are server errors."""
+    with pytest.raises(HTTPError) as e:
+        urlopen(f"{server_url}/convert", data=b"not json")
+    assert e.value.code == 400
+
+    def fork(self, **changes):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(ConvertContext, "fork", fork)
+    with pytest.raises(HTTPError) as e:
+        urlopen(f"{server_url}/convert", data=b"{}")
+    assert e.value.code == 500
+
+    with urlopen(f"{server_url}/metrics") as response:
+        stats = json.load(response)["paths"]["/convert"]
+    assert (stats["client_errors"], stats["server_errors"]) == (1, 1)
+
+
+def test_invalid_requests(server_url):
+    """Test invalid Content-Length is rejected and unknown paths share metrics."""
+    for length in ["abc", "-1"]:
+        conn = HTTPConnection(server_url.removeprefix("http://"))
+        conn.putrequest("POST", "/convert")
+        conn.putheader("Content-Length", length)
+        conn.endheaders()
+        assert conn.getresponse().status == 400
+        conn.close()
+    for i in range(3):
+        with pytest.raises(HTTPError) as e:
+            urlopen(f"{server_url}/x{i}")
+        assert e.value.code == 404
+
+    with urlopen(f"{server_url}/metrics") as response:
+        paths = json.load(response)["paths"]
+    assert paths["/convert"]["client_errors"] == 2
+    assert paths["other"]["requests"] == 3
+    assert not any(path.startswith("/x") for path in paths)
+
+
+def test_archive(server_url):
+    """Test archives contain the bodies at the locations of the generated code."""
+    body = json.dumps(make_har("https://example.com/logo.png")).encode()
+    with urlopen(f"{server_url}/archive", data=body) as response:
+        archive = zipfile.ZipFile(io.BytesIO(response.read()))
+
+    script = archive.read("main.py").decode()
+    (name,) = [n for n in archive.namelist() if n.endswith(".png")]
+    assert name.startswith("out/binary-")
+    assert f"=== Save to file: {name} ===" in script
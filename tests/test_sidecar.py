@@ -0,0 +1,73 @@
+"""Tests for sidecar module."""
+
+import json
+from types import SimpleNamespace
+
+from har2code import ConvertContext
+from har2code.sidecar import Sidecar
+from har2code.tostr import code_to_str
+
+
+def make_entry(url, payload):
+    """Build a HAR entry posting a JSON payload."""
+    return {
+        "startedDateTime": "2024-01-01T00:00:00.000Z",
+        "time": 10,
+        "request": {
+            "method": "POST",
+            "url": url,
+            "httpVersion": "HTTP/1.1",
+            "cookies": [],
+            "headers": [],
+            "queryString": [],
+            "postData": {"mimeType": "application/json", "text": json.dumps(payload)},
+            "headersSize": -1,
+            "bodySize": 0,
+        },
+        "response": {
+            "status": 200,
+            "httpVersion": "HTTP/1.1",
+            "cookies": [],
+            "headers": [],
+            "content": {"size": 0, "mimeType": "application/json", "text": ""},
+            "headersSize": -1,
+            "bodySize": 0,
+        },
+        "cache": {},
+        "timings": {},
+    }
+
+
+def test_store(tmp_path):
+    """Test large payloads are stored by offset and small ones are kept inline."""
+    path = tmp_path / "payloads.jsonl"
+    with Sidecar(path, threshold=16) as sidecar:
+        assert sidecar.store({"a": 1}) is None
+        first = sidecar.store({"query": "x" * 32})
+        second = sidecar.store(["y" * 32])
+
+    with open(path, "rb") as fp:
+        for (offset, length), expected in [
+            (first, {"query": "x" * 32}),
+            (second, ["y" * 32]),
+        ]:
+            fp.seek(offset)
+            assert json.loads(fp.read(length)) == expected
+
+
+def test_load_payload(tmp_path):
+    """Test the generated code loads externalized payloads back."""
+    ctx = ConvertContext(output=tmp_path / "out", exclude_exts=[])
+    entry = make_entry("https://example.com/graphql", {"query": "x" * 64})
+    codes = list(ctx.iter_entries({"log": {"entries": [entry]}}))
+
+    with Sidecar(tmp_path / "data" / "payloads.jsonl", threshold=16) as sidecar:
+        script = code_to_str(codes, "requests", sidecar)
+
+    assert "json = load_payload(0, " in script
+    calls = []
+    fake_requests = SimpleNamespace(
+        request=lambda *args, **kwargs: calls.append(kwargs)
+    )
+    exec(script.replace("import requests\n", ""), {"requests": fake_requests})
+    assert calls[0]["json"] == {"query": "x" * 64}
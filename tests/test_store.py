@@ -0,0 +1,80 @@
+"""Tests for store module."""
+
+import io
+import json
+
+from har2code.store import SqliteContext, SqliteStore
+
+
+def make_entry(url, mime="image/png", text="png"):
+    """Build a HAR entry returning a body of the given MIME type."""
+    return {
+        "startedDateTime": "2024-01-01T00:00:00.000Z",
+        "time": 10,
+        "request": {
+            "method": "GET",
+            "url": url,
+            "httpVersion": "HTTP/1.1",
+            "cookies": [],
+            "headers": [{"name": "Accept", "value": "*/*"}],
+            "queryString": [],
+            "headersSize": -1,
+            "bodySize": 0,
+        },
+        "response": {
+            "status": 200,
+            "httpVersion": "HTTP/1.1",
+            "cookies": [],
+            "headers": [{"name": "Content-Type", "value": mime}],
+            "content": {"size": len(text), "mimeType": mime, "text": text},
+            "headersSize": -1,
+            "bodySize": len(text),
+        },
+        "cache": {},
+        "timings": {},
+    }
+
+
+def test_write_and_query(tmp_path):
+    """Test entries are stored with deduplicated blobs and queried back."""
+    har = {
+        "log": {
+            "entries": [
+                make_entry("https://a.com/1.png"),
+                make_entry("https://b.com/2.png"),
+            ]
+        }
+    }
+
+    with SqliteStore(tmp_path / "har.sqlite") as store:
+        ctx = SqliteContext(output=tmp_path / "out", exclude_exts=[], store=store)
+        assert store.write(ctx, io.StringIO(json.dumps(har)), batch_size=1) == 2
+        (blobs,) = store.conn.execute("SELECT COUNT(*) FROM blobs").fetchone()
+        codes = list(store.iter_codes("host = ?", ["b.com"]))
+
+    assert blobs == 1
+    assert len(codes) == 1
+    assert codes[0].request.headers == {"Accept": "*/*"}
+    assert codes[0].response.headers[0].value == "image/png"
+    assert len(list((tmp_path / "out").glob("binary-*.png"))) == 1
+
+
+def test_json_bodies_are_blobs(tmp_path):
+    """Test JSON bodies are stored as blobs by default."""
+    har = {
+        "log": {
+            "entries": [
+                make_entry(f"https://a.com/{i}", "application/json", '{"a": 1}')
+                for i in range(2)
+            ]
+        }
+    }
+
+    with SqliteStore(tmp_path / "har.sqlite") as store:
+        ctx = SqliteContext(output=tmp_path / "out", store=store)
+        store.write(ctx, io.StringIO(json.dumps(har)), batch_size=10)
+        (blobs,) = store.conn.execute("SELECT COUNT(*) FROM blobs").fetchone()
+        codes = list(store.iter_codes(materialize=False))
+
+    assert blobs == 1
+    assert all(c.response.content.endswith(".json ===") for c in codes)